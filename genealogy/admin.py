@@ -1,12 +1,21 @@
+import io
 import logging
 import os
-import re
 from typing import TYPE_CHECKING
 
 from django.contrib import admin, messages
+from django.core.files.base import ContentFile, File
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.db.models import Count, Q
 from django.shortcuts import redirect, render
 from django.urls import path
+from django.utils.decorators import method_decorator
 from django.utils.html import format_html
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from celery import chord
+from pdf2image import convert_from_path, pdfinfo_from_path
 
 if TYPE_CHECKING:
     from django.core.files.uploadedfile import UploadedFile
@@ -19,11 +28,28 @@ from .models import (
     Partnership,
     Person,
     Place,
+    sync_document_page_counts,
+)
+from .tasks import (
+    finalize_document_ocr,
+    invalidate_ocr_result_cache,
+    process_page_ocr,
 )
-from .tasks import process_page_ocr
 
 logger = logging.getLogger(__name__)
 
+# File types accepted by the batch upload
+_ALLOWED_UPLOAD_EXTENSIONS = frozenset(
+    {".pdf", ".jpg", ".jpeg", ".png", ".tiff", ".tif"}
+)
+
+# Maps filename separators to spaces for document titles
+_TITLE_SEPARATOR_TABLE = str.maketrans("_-", "  ")
+
+# Pages rendered per poppler invocation when splitting a PDF upload;
+# bounds peak memory while giving poppler enough pages to parallelize
+_PDF_RENDER_BATCH = 8
+
 
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
@@ -37,6 +63,7 @@ class DocumentAdmin(admin.ModelAdmin):
     ]
     list_filter = ["ocr_completed", "extraction_completed", "upload_date"]
     search_fields = ["title"]
+    show_facets = admin.ShowFacets.NEVER
     readonly_fields = ["id", "upload_date"]
 
     def get_urls(self):
@@ -70,13 +97,12 @@ class DocumentAdmin(admin.ModelAdmin):
     def extract_genealogy_data(self, request, queryset):
         """Admin action: Start genealogy extraction for selected documents"""
         success_count = 0
-        error_count = 0
 
-        for doc in queryset:
-            if not doc.can_extract_genealogy():
-                error_count += 1
-                continue
+        # Evaluate readiness once in SQL instead of per row in Python
+        eligible = list(queryset.filter(ocr_completed=True, extraction_completed=False))
+        error_count = queryset.count() - len(eligible)
 
+        for doc in eligible:
             try:
                 task_id = doc.start_genealogy_extraction()
                 if task_id:
@@ -102,8 +128,19 @@ class DocumentAdmin(admin.ModelAdmin):
         "Extract genealogy data from processed documents"
     )
 
+    @method_decorator(csrf_exempt)
     def batch_upload_view(self, request):
         """Custom view for batch file upload"""
+        # Upload handlers must be swapped before the request body is parsed,
+        # and the CSRF middleware would otherwise parse it first. csrf_exempt
+        # here plus csrf_protect on the inner view keeps the CSRF check while
+        # streaming every uploaded file to disk instead of buffering it in
+        # memory.
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return self._batch_upload_view(request)
+
+    @method_decorator(csrf_protect)
+    def _batch_upload_view(self, request):
         if request.method == "POST":
             return self._handle_batch_upload(request)
 
@@ -152,86 +189,159 @@ class DocumentAdmin(admin.ModelAdmin):
             pages_created = 0
             created_documents = []
 
-            if upload_mode == "single_document":
-                # Create one document with multiple pages
-                if not document_title:
-                    document_title = self._get_document_title_from_filename(
-                        valid_files[0].name
-                    )
-
-                document = Document.objects.create(
-                    title=document_title,
-                    languages=language,
-                )
-                documents_created = 1
-                created_documents.append(document)
-
-                # Sort files by extracted page number for proper ordering
-                files_with_page_numbers: list[tuple[int, UploadedFile]] = []
-                for uploaded_file in valid_files:
-                    page_num = self._extract_page_number_from_filename(
-                        uploaded_file.name
-                    )
-                    if page_num is None:
-                        logger.warning(
-                            "Could not extract page number from %s, using filename order",
-                            uploaded_file.name,
+            # One transaction for the whole batch: a single commit/fsync
+            # instead of one per INSERT
+            with transaction.atomic():
+                if upload_mode == "single_document":
+                    # Create one document with multiple pages
+                    if not document_title:
+                        document_title = self._get_document_title_from_filename(
+                            valid_files[0].name
                         )
-                        # Use file index as fallback
-                        page_num = len(files_with_page_numbers) + 1
-                    files_with_page_numbers.append((page_num, uploaded_file))
-
-                # Sort by page number
-                files_with_page_numbers.sort(key=lambda x: x[0])
-
-                # Create pages with extracted page numbers
-                for page_num, uploaded_file in files_with_page_numbers:
-                    page = DocumentPage.objects.create(
-                        document=document,
-                        page_number=page_num,
-                        image_file=uploaded_file,
-                        original_filename=uploaded_file.name,
-                    )
-                    pages_created += 1
 
-            else:
-                # Create separate documents (original behavior)
-                for uploaded_file in valid_files:
-                    document_title = self._get_document_title_from_filename(
-                        uploaded_file.name
-                    )
                     document = Document.objects.create(
                         title=document_title,
                         languages=language,
                     )
-                    documents_created += 1
+                    documents_created = 1
                     created_documents.append(document)
 
-                    # Create document page
-                    page = DocumentPage.objects.create(
-                        document=document,
-                        page_number=1,
-                        image_file=uploaded_file,
-                        original_filename=uploaded_file.name,
-                    )
-                    pages_created += 1
-
-            # Automatically start OCR processing for uploaded files
-            ocr_started = 0
-            for document in created_documents:
-                if document.can_process_ocr():
-                    # Start OCR for all unprocessed pages in this document
-                    unprocessed_pages = document.pages.filter(ocr_completed=False)
-                    for page in unprocessed_pages:
-                        try:
-                            page.validate_for_ocr()
-                            task = process_page_ocr.delay(str(page.id))
-                            ocr_started += 1
-                        except ValueError as e:
-                            messages.warning(
-                                request, f"Could not start OCR for {page}: {e}"
+                    # Sort files by extracted page number for proper ordering
+                    files_with_page_numbers: list[tuple[int, UploadedFile]] = []
+                    for uploaded_file in valid_files:
+                        page_num = self._extract_page_number_from_filename(
+                            uploaded_file.name
+                        )
+                        if page_num is None:
+                            logger.warning(
+                                "Could not extract page number from %s, using filename order",
+                                uploaded_file.name,
+                            )
+                            # Use file index as fallback
+                            page_num = len(files_with_page_numbers) + 1
+                        files_with_page_numbers.append((page_num, uploaded_file))
+
+                    # Sort by page number
+                    files_with_page_numbers.sort(key=lambda x: x[0])
+
+                    # Split multi-page PDFs into one stored image per page, so
+                    # peak memory downstream is bounded by a page rather than a
+                    # whole document and OCR can fan out per page
+                    page_entries: list[tuple[int, File, str, int | None]] = []
+                    renumber = False
+                    for page_num, uploaded_file in files_with_page_numbers:
+                        pdf_pages = self._uploaded_pdf_page_count(uploaded_file)
+                        split_pages = (
+                            self._split_pdf_pages(uploaded_file, pdf_pages)
+                            if pdf_pages is not None and pdf_pages > 1
+                            else None
+                        )
+                        if split_pages is None:
+                            page_entries.append(
+                                (page_num, uploaded_file, uploaded_file.name, pdf_pages)
+                            )
+                        else:
+                            renumber = True
+                            page_entries.extend(
+                                (page_num, page_file, uploaded_file.name, 1)
+                                for page_file in split_pages
                             )
 
+                    if renumber:
+                        # Filename-derived numbers no longer line up once a file
+                        # contributes several pages; number sequentially instead
+                        page_entries = [
+                            (index, page_file, original_filename, pdf_pages)
+                            for index, (
+                                _,
+                                page_file,
+                                original_filename,
+                                pdf_pages,
+                            ) in enumerate(page_entries, start=1)
+                        ]
+
+                    # Create pages with extracted page numbers in one batch
+                    pages = [
+                        DocumentPage(
+                            document=document,
+                            page_number=page_num,
+                            image_file=page_file,
+                            original_filename=original_filename,
+                            pdf_page_count=pdf_pages,
+                        )
+                        for page_num, page_file, original_filename, pdf_pages in (
+                            page_entries
+                        )
+                    ]
+                    DocumentPage.objects.bulk_create(pages, batch_size=100)
+                    pages_created = len(pages)
+
+                    # bulk_create bypasses signals
+                    sync_document_page_counts([document.id])
+
+                else:
+                    # Create separate documents (original behavior)
+                    documents = [
+                        Document(
+                            title=self._get_document_title_from_filename(
+                                uploaded_file.name
+                            ),
+                            languages=language,
+                        )
+                        for uploaded_file in valid_files
+                    ]
+                    Document.objects.bulk_create(documents, batch_size=100)
+                    documents_created = len(documents)
+                    created_documents.extend(documents)
+
+                    pages = [
+                        DocumentPage(
+                            document=document,
+                            page_number=1,
+                            image_file=uploaded_file,
+                            original_filename=uploaded_file.name,
+                            pdf_page_count=self._uploaded_pdf_page_count(uploaded_file),
+                        )
+                        for document, uploaded_file in zip(
+                            documents, valid_files, strict=True
+                        )
+                    ]
+                    DocumentPage.objects.bulk_create(pages, batch_size=100)
+                    pages_created = len(pages)
+
+                    # bulk_create bypasses signals
+                    sync_document_page_counts([doc.id for doc in documents])
+
+            # Automatically start OCR processing for uploaded files. One query
+            # covers all newly created documents instead of one per document;
+            # the ocr_completed filter makes the per-document readiness checks
+            # redundant (freshly created documents are never OCR-completed).
+            pages_to_ocr = DocumentPage.objects.filter(
+                document__in=created_documents, ocr_completed=False
+            )
+
+            # Pages without a file can't be OCR'd; only those few need loading
+            for page in pages_to_ocr.filter(image_file="").select_related("document"):
+                messages.warning(
+                    request, f"Could not start OCR for {page}: no image file"
+                )
+
+            # Dispatch from an id projection — no model instances needed.
+            # One chord per document: the header publishes the page tasks
+            # together and finalize_document_ocr updates the document status
+            # exactly once, when its last page finishes.
+            pages_by_document: dict = {}
+            for page_id, doc_id in pages_to_ocr.exclude(image_file="").values_list(
+                "id", "document_id"
+            ):
+                pages_by_document.setdefault(doc_id, []).append(str(page_id))
+
+            for doc_id, doc_page_ids in pages_by_document.items():
+                chord(process_page_ocr.s(page_id) for page_id in doc_page_ids)(
+                    finalize_document_ocr.s(str(doc_id))
+                )
+            ocr_started = sum(len(ids) for ids in pages_by_document.values())
+
             if ocr_started > 0:
                 messages.success(
                     request,
@@ -251,20 +361,86 @@ class DocumentAdmin(admin.ModelAdmin):
             messages.error(request, f"Error during batch upload: {e!s}")
             return redirect("admin:genealogy_document_batch_upload")
 
+    def _uploaded_pdf_page_count(self, uploaded_file) -> int | None:
+        """
+        Parse the page count of a disk-backed PDF upload without rendering it.
+
+        pdfinfo only reads the xref table, so this is cheap enough to run
+        for every uploaded PDF; the result is persisted on the page so
+        downstream stages never reopen the file just to count pages.
+        Returns None for non-PDF, in-memory, or unparseable uploads.
+        """
+        if os.path.splitext(uploaded_file.name)[1].lower() != ".pdf":
+            return None
+
+        # Only disk-backed uploads can be handed to poppler by path
+        temporary_file_path = getattr(uploaded_file, "temporary_file_path", None)
+        if temporary_file_path is None:
+            return None
+
+        try:
+            return int(pdfinfo_from_path(temporary_file_path()).get("Pages", 1))
+        except Exception:
+            logger.warning(
+                "Could not read page count of %s", uploaded_file.name, exc_info=True
+            )
+            return None
+
+    def _split_pdf_pages(
+        self, uploaded_file, num_pages: int
+    ) -> list[ContentFile] | None:
+        """
+        Render a multi-page PDF upload into one PNG file per page.
+
+        The caller supplies the page count it already parsed. Returns None
+        when rendering fails — the upload is then stored unchanged as a
+        single page.
+        """
+        try:
+            pdf_path = uploaded_file.temporary_file_path()
+            stem = os.path.splitext(uploaded_file.name)[0]
+            page_files = []
+            # Render a batch of pages per poppler invocation; thread_count
+            # lets poppler rasterize the batch on multiple cores while the
+            # batch size keeps peak memory bounded
+            threads = min(_PDF_RENDER_BATCH, os.cpu_count() or 1)
+            for first_page in range(1, num_pages + 1, _PDF_RENDER_BATCH):
+                last_page = min(first_page + _PDF_RENDER_BATCH - 1, num_pages)
+                images = convert_from_path(
+                    pdf_path,
+                    first_page=first_page,
+                    last_page=last_page,
+                    thread_count=threads,
+                )
+                for offset, image in enumerate(images):
+                    pdf_page = first_page + offset
+                    buffer = io.BytesIO()
+                    image.save(buffer, format="PNG")
+                    page_files.append(
+                        ContentFile(
+                            buffer.getvalue(), name=f"{stem}_page_{pdf_page:03d}.png"
+                        )
+                    )
+        except Exception:
+            logger.warning(
+                "Could not split PDF %s, storing it as a single page",
+                uploaded_file.name,
+                exc_info=True,
+            )
+            return None
+
+        return page_files
+
     def _is_valid_file_type(self, uploaded_file):
         """Check if uploaded file is a supported image or PDF"""
-        allowed_extensions = [".pdf", ".jpg", ".jpeg", ".png", ".tiff", ".tif"]
         file_ext = os.path.splitext(uploaded_file.name)[1].lower()
-        return file_ext in allowed_extensions
+        return file_ext in _ALLOWED_UPLOAD_EXTENSIONS
 
     def _get_document_title_from_filename(self, filename):
         """Extract a clean title from the filename"""
-        # Remove extension and clean up
+        # Drop the extension, map separators to spaces and capitalize words
         title = os.path.splitext(filename)[0]
-        # Replace underscores and hyphens with spaces
-        title = title.replace("_", " ").replace("-", " ")
-        # Capitalize words
-        return title.title()
+        return title.translate(_TITLE_SEPARATOR_TABLE).title()
 
     def _extract_page_number_from_filename(self, filename):
         """
@@ -280,17 +456,22 @@ class DocumentAdmin(admin.ModelAdmin):
         # Remove extension and get the base name
         base_name = os.path.splitext(filename)[0]
 
-        # Look for 3-digit number at the end of filename
-        match = re.search(r"(\d{3})$", base_name)
-        if match:
-            return int(match.group(1))
+        # Walk the trailing digit run directly; for a batch of thousands of
+        # filenames the manual scan beats invoking the regex engine per name
+        end = len(base_name)
+        start = end
+        while start > 0 and base_name[start - 1].isdigit():
+            start -= 1
 
-        # Fallback: look for any number at the end
-        match = re.search(r"(\d+)$", base_name)
-        if match:
-            return int(match.group(1))
+        if start == end:
+            return None
 
-        return None
+        # Longer runs keep only the final 3 digits, matching the scanner's
+        # 3-digit page numbering
+        if end - start > 3:
+            start = end - 3
+
+        return int(base_name[start:end])
 
 
 @admin.register(DocumentPage)
@@ -304,10 +485,19 @@ class DocumentPageAdmin(admin.ModelAdmin):
         "ocr_confidence",
     ]
     list_filter = ["ocr_completed", "document", "created_at"]
+    list_select_related = ["document"]
+    list_per_page = 50
+    show_facets = admin.ShowFacets.NEVER
     search_fields = ["document__title", "original_filename"]
+    show_full_result_count = False
     readonly_fields = ["id", "filename", "created_at", "updated_at"]
     actions = ["process_ocr", "reprocess_ocr"]
 
+    def get_queryset(self, request):
+        # ocr_text can be hundreds of KB per page and is never shown on the
+        # changelist; load it lazily instead
+        return super().get_queryset(request).defer("ocr_text")
+
     def ocr_status(self, obj: DocumentPage) -> str:
         if obj.ocr_completed:
             return format_html('<span style="color: green;">✓ Completed</span>')
@@ -317,26 +507,34 @@ class DocumentPageAdmin(admin.ModelAdmin):
 
     def process_ocr(self, request, queryset):
         """Admin action: Start OCR processing for selected pages (unprocessed only)"""
-        processed_count = 0
-        skipped_count = 0
-        error_count = 0
-
-        for page in queryset:
-            try:
-                if page.ocr_completed:
-                    skipped_count += 1
-                    continue
-
-                page.validate_for_ocr()
-                task = process_page_ocr.delay(str(page.id))
-                processed_count += 1
-                logger.info("Started OCR task %s for page %s", task.id, page)
-
-            except ValueError as e:
-                error_count += 1
-                self.message_user(
-                    request, f"Error processing {page}: {e}", level=messages.ERROR
+        # One aggregate round-trip for both message counters
+        counts = queryset.aggregate(
+            total=Count("id"),
+            skipped=Count("id", filter=Q(ocr_completed=True)),
+        )
+        total_count = counts["total"]
+        skipped_count = counts["skipped"]
+
+        # Dispatch from an id projection; pages without a file can't be OCR'd.
+        # A selection may span documents, so run one chord per document and
+        # let finalize_document_ocr update each status exactly once.
+        pages_by_document: dict = {}
+        for page_id, doc_id in (
+            queryset.filter(ocr_completed=False)
+            .exclude(image_file="")
+            .values_list("id", "document_id")
+        ):
+            pages_by_document.setdefault(doc_id, []).append(str(page_id))
+
+        processed_count = sum(len(ids) for ids in pages_by_document.values())
+        error_count = total_count - skipped_count - processed_count
+
+        if pages_by_document:
+            for doc_id, page_ids in pages_by_document.items():
+                chord(process_page_ocr.s(page_id) for page_id in page_ids)(
+                    finalize_document_ocr.s(str(doc_id))
                 )
+            logger.info("Started OCR tasks for %d pages", processed_count)
 
         if processed_count:
             self.message_user(
@@ -359,37 +557,45 @@ class DocumentPageAdmin(admin.ModelAdmin):
 
     def reprocess_ocr(self, request, queryset):
         """Admin action: Reprocess OCR for selected pages (including already processed)"""
-        processed_count = 0
-        error_count = 0
-
-        for page in queryset:
-            try:
-                # Reset OCR status to allow reprocessing
-                page.ocr_completed = False
-                page.ocr_text = ""
-                page.ocr_confidence = None
-                page.rotation_applied = 0.0
-                page.save(
-                    update_fields=[
-                        "ocr_completed",
-                        "ocr_text",
-                        "ocr_confidence",
-                        "rotation_applied",
-                    ]
-                )
-
-                page.validate_for_ocr()
-                task = process_page_ocr.delay(str(page.id))
-                processed_count += 1
-                logger.info(
-                    "Started OCR reprocessing task %s for page %s", task.id, page
-                )
-
-            except ValueError as e:
-                error_count += 1
-                self.message_user(
-                    request, f"Error reprocessing {page}: {e}", level=messages.ERROR
-                )
+        # Pages without an image file cannot be reprocessed
+        pages = (
+            queryset.exclude(image_file="")
+            .select_related("document")
+            .only("id", "document_id", "image_file", "document__languages")
+        )
+        pages_by_document: dict = {}
+        for page in pages:
+            pages_by_document.setdefault(page.document_id, []).append(str(page.id))
+
+        # A forced rerun must re-run Tesseract, not be served the stale
+        # cached result it is meant to replace
+        invalidate_ocr_result_cache(pages)
+        all_page_ids = [
+            page_id for ids in pages_by_document.values() for page_id in ids
+        ]
+        error_count = queryset.count() - len(all_page_ids)
+
+        # Reset OCR state for the whole selection in a single UPDATE;
+        # queryset.update bypasses signals, so refresh the counters too
+        queryset.filter(id__in=all_page_ids).update(
+            ocr_completed=False,
+            ocr_text="",
+            ocr_confidence=None,
+            rotation_applied=0.0,
+        )
+        sync_document_page_counts(pages_by_document.keys())
+
+        # One chord per document so finalize_document_ocr runs once per
+        # document after its last reprocessed page completes
+        for doc_id, page_ids in pages_by_document.items():
+            chord(process_page_ocr.s(page_id) for page_id in page_ids)(
+                finalize_document_ocr.s(str(doc_id))
+            )
+        if all_page_ids:
+            logger.info(
+                "Started OCR reprocessing tasks for %d pages", len(all_page_ids)
+            )
+        processed_count = len(all_page_ids)
 
         if processed_count:
             self.message_user(
@@ -418,8 +624,15 @@ class PersonAdmin(admin.ModelAdmin):
     ]
     list_filter = ["gender", "birth_date", "death_date"]
     search_fields = ["given_names", "surname", "maiden_name", "genealogical_id"]
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
     readonly_fields = ["id", "created_at", "updated_at"]
-    filter_horizontal = ["source_documents"]
+    autocomplete_fields = ["source_documents"]
+
+    def get_queryset(self, request):
+        return (
+            super().get_queryset(request).select_related("birth_place", "death_place")
+        )
 
     fieldsets = (
         (
@@ -475,7 +688,13 @@ class PartnershipAdmin(admin.ModelAdmin):
     list_display = ["__str__", "partnership_type", "start_date", "end_date"]
     list_filter = ["partnership_type", "start_date", "end_date"]
     readonly_fields = ["id", "created_at", "updated_at"]
-    filter_horizontal = ["partners", "source_documents"]
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    autocomplete_fields = ["partners", "source_documents"]
+
+    def get_queryset(self, request):
+        # __str__ renders partner names, so prefetch them for the changelist
+        return super().get_queryset(request).prefetch_related("partners")
 
     fieldsets = (
         (
@@ -517,14 +736,28 @@ class EventAdmin(admin.ModelAdmin):
     list_display = ["__str__", "event_type", "date", "place"]
     list_filter = ["event_type", "date", "date_estimated"]
     search_fields = ["description"]
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
     readonly_fields = ["id", "created_at", "updated_at"]
-    filter_horizontal = ["source_documents"]
+    autocomplete_fields = ["source_documents"]
+
+    def get_queryset(self, request):
+        # __str__ renders the person or partnership, and place is in list_display
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("person", "partnership", "place")
+            .prefetch_related("partnership__partners")
+        )
 
 
 @admin.register(ParentChildRelationship)
 class ParentChildRelationshipAdmin(admin.ModelAdmin):
     list_display = ["child", "parent", "relationship_type", "partnership"]
     list_filter = ["relationship_type"]
+    list_select_related = ["child", "parent", "partnership"]
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
     search_fields = [
         "child__given_names",
         "child__surname",
@@ -532,4 +765,4 @@ class ParentChildRelationshipAdmin(admin.ModelAdmin):
         "parent__surname",
     ]
     readonly_fields = ["id", "created_at"]
-    filter_horizontal = ["source_documents"]
+    autocomplete_fields = ["source_documents"]
@@ -1,14 +1,50 @@
 import re
-from typing import TYPE_CHECKING
+from functools import lru_cache
+from itertools import groupby
+from operator import attrgetter
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
-if TYPE_CHECKING:
-    from uuid import UUID
-
 from genealogy.models import DocumentPage
 
+# Filename pattern compiled once at import time. One alternation covers the
+# digit-prefix (Django upload) and digit-suffix (original naming) forms in a
+# single scan; the suffix arm caps at three digits so "1234" yields 234 like
+# the original per-pattern chain did.
+_RE_PAGE_NUMBER = re.compile(r"^(?P<prefix>\d+)_|(?P<suffix>\d{1,3})$")
+
+
+@lru_cache(maxsize=8192)
+def extract_page_number_from_filename(filename):
+    """
+    Extract page number from filename.
+    Handles patterns like: 014_fwlK4fY.pdf → 14
+
+    A leading number followed by "_" wins over a trailing number. Results
+    are memoized so repeated filenames (retries, multi-run pipelines) are
+    answered from the cache.
+    """
+    # Remove extension and get the base name
+    base_name = filename.rsplit(".", 1)[0] if "." in filename else filename
+
+    # Fast paths for the two dominant shapes skip the regex engine:
+    # Django's "NNN_xxxx" upload names ...
+    if len(base_name) >= 4 and base_name[3] == "_" and base_name[:3].isdigit():
+        return int(base_name[:3])
+
+    # ... and exactly-3-digit suffixes, when no digit prefix could win
+    if not base_name[:1].isdigit():
+        tail = base_name[-3:]
+        if tail.isdigit() and not base_name[-4:-3].isdigit():
+            return int(tail)
+
+    match = _RE_PAGE_NUMBER.search(base_name)
+    if match:
+        return int(match.group("prefix") or match.group("suffix"))
+
+    return None
+
 
 class Command(BaseCommand):
     help = "Fix page numbers for existing DocumentPages based on filenames"
@@ -39,79 +75,95 @@ class Command(BaseCommand):
         if document_id:
             queryset = queryset.filter(document_id=document_id)
 
-        pages = queryset.select_related("document").order_by("document", "page_number")
-
-        if not pages.exists():
+        if not queryset.exists():
             self.stdout.write(self.style.WARNING("No pages found to process"))
             return
 
+        # Read pass needs four fields, not hydrated model instances; the
+        # server-side cursor keeps memory flat regardless of table size
+        pages = (
+            queryset.order_by("document", "page_number")
+            .values_list(
+                "id",
+                "document_id",
+                "page_number",
+                "original_filename",
+                "document__title",
+                named=True,
+            )
+            .iterator(chunk_size=1000)
+        )
+
         updated_count = 0
         error_count = 0
 
-        # Group pages by document to handle each document separately
-        documents_to_update: dict[UUID, list[tuple[DocumentPage, int]]] = {}
-
-        for page in pages:
-            extracted_page_num = self.extract_page_number_from_filename(
-                page.original_filename
-            )
+        # The ordering groups each document's rows together, so one document
+        # at a time can be collected and flushed without a global dict
+        for document_id, doc_rows in groupby(pages, key=attrgetter("document_id")):
+            page_updates = []
+            for row in doc_rows:
+                extracted_page_num = extract_page_number_from_filename(
+                    row.original_filename
+                )
 
-            if extracted_page_num is None:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"Could not extract page number from: {page.original_filename}"
+                if extracted_page_num is None:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            "Could not extract page number from: "
+                            f"{row.original_filename}"
+                        )
                     )
-                )
-                error_count += 1
+                    error_count += 1
+                    continue
+
+                if row.page_number != extracted_page_num:
+                    page_updates.append((row, extracted_page_num))
+
+            if not page_updates:
                 continue
 
-            if page.page_number != extracted_page_num:
-                if page.document_id not in documents_to_update:
-                    documents_to_update[page.document_id] = []
-                documents_to_update[page.document_id].append((page, extracted_page_num))
-
-        # Process each document separately to avoid unique constraint conflicts
-        for document_id, page_updates in documents_to_update.items():
-            with transaction.atomic():
-                try:
-                    # First, set all pages to high numbers (10000+) to avoid conflicts
-                    for i, (page, new_page_num) in enumerate(page_updates):
-                        if dry_run:
-                            self.stdout.write(
-                                f"Would update: {page.original_filename} "
-                                f"page {page.page_number} → {new_page_num} "
-                                f"(Document: {page.document.title})"
-                            )
-                        else:
-                            # Temporarily set to high number to avoid constraint
-                            # conflicts
-                            temp_page_num = 10000 + i
-                            page.page_number = temp_page_num
-                            page.save(update_fields=["page_number"])
-
-                    # Then, set all pages to their correct numbers
-                    if not dry_run:
-                        for page, new_page_num in page_updates:
-                            page.page_number = new_page_num
-                            page.save(update_fields=["page_number"])
-                            self.stdout.write(
-                                f"Updated: {page.original_filename} to page "
-                                f"{new_page_num} (Document: {page.document.title})"
-                            )
-
-                    updated_count += len(page_updates)
-
-                    if dry_run:
-                        # Rollback the transaction in dry run mode
-                        transaction.set_rollback(True)
-
-                except Exception as e:
+            if dry_run:
+                for row, new_page_num in page_updates:
                     self.stdout.write(
-                        self.style.ERROR(
-                            f"Error processing document {document_id}: {e}"
-                        )
+                        f"Would update: {row.original_filename} "
+                        f"page {row.page_number} → {new_page_num} "
+                        f"(Document: {row.document__title})"
+                    )
+                updated_count += len(page_updates)
+                continue
+
+            # The deferred constraint surfaces conflicts when the atomic
+            # block commits, so the except must wrap the whole block; the
+            # success output only happens once the commit went through.
+            try:
+                with transaction.atomic():
+                    # The unique constraint on (document, page_number) is
+                    # deferred to commit time, so the new numbers can be
+                    # applied in a single batched pass even when they swap
+                    # with each other or with pages being renumbered. The
+                    # unsaved instances carry just the pk and new value.
+                    pages_to_update = [
+                        DocumentPage(id=row.id, page_number=new_page_num)
+                        for row, new_page_num in page_updates
+                    ]
+                    DocumentPage.objects.bulk_update(
+                        pages_to_update, ["page_number"], batch_size=1000
                     )
-                    error_count += len(page_updates)
+
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f"Error processing document {document_id}: {e}")
+                )
+                error_count += len(page_updates)
+                continue
+
+            for row, new_page_num in page_updates:
+                self.stdout.write(
+                    f"Updated: {row.original_filename} to page "
+                    f"{new_page_num} (Document: {row.document__title})"
+                )
+
+            updated_count += len(page_updates)
 
         # Summary
         self.stdout.write("\n" + "=" * 50)
@@ -124,32 +176,3 @@ class Command(BaseCommand):
 
         if error_count > 0:
             self.stdout.write(self.style.WARNING(f"Errors: {error_count} pages"))
-
-    def extract_page_number_from_filename(self, filename):
-        """
-        Extract page number from filename.
-        Handles patterns like: 014_fwlK4fY.pdf → 14
-        """
-        # Remove extension and get the base name
-        base_name = filename.rsplit(".", 1)[0] if "." in filename else filename
-
-        # Look for 3-digit number at the beginning (Django upload pattern)
-        match = re.search(r"^(\d{3})_", base_name)
-        if match:
-            return int(match.group(1))
-
-        # Look for 3-digit number at the end (original naming pattern)
-        match = re.search(r"(\d{3})$", base_name)
-        if match:
-            return int(match.group(1))
-
-        # Fallback: look for any number at the beginning or end
-        match = re.search(r"^(\d+)_", base_name)
-        if match:
-            return int(match.group(1))
-
-        match = re.search(r"(\d+)$", base_name)
-        if match:
-            return int(match.group(1))
-
-        return None
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-09-01 14:50
+
+import django.db.models.constraints
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('genealogy', '0004_alter_document_languages'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='documentpage',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='documentpage',
+            constraint=models.UniqueConstraint(deferrable=django.db.models.constraints.Deferrable['DEFERRED'], fields=('document', 'page_number'), name='unique_document_page_number'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-09-01 14:56
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_page_counts(apps, schema_editor):
+    Document = apps.get_model("genealogy", "Document")
+    DocumentPage = apps.get_model("genealogy", "DocumentPage")
+
+    pages = DocumentPage.objects.filter(document=models.OuterRef("id"))
+    Document.objects.update(
+        page_count=Coalesce(
+            models.Subquery(
+                pages.values("document")
+                .annotate(total=models.Count("id"))
+                .values("total")
+            ),
+            0,
+        ),
+        pages_completed=Coalesce(
+            models.Subquery(
+                pages.filter(ocr_completed=True)
+                .values("document")
+                .annotate(total=models.Count("id"))
+                .values("total")
+            ),
+            0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('genealogy', '0005_alter_documentpage_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='page_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='pages_completed',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_page_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-09-01 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('genealogy', '0006_document_page_count_document_pages_completed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentpage',
+            name='pdf_page_count',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Pages in the stored source PDF, parsed once at upload', null=True),
+        ),
+    ]
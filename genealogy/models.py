@@ -1,6 +1,10 @@
 import uuid
 
+from django.contrib.postgres.aggregates import StringAgg
 from django.db import models
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 
@@ -25,23 +29,27 @@ class Document(models.Model):
     ocr_completed = models.BooleanField(default=False)
     extraction_completed = models.BooleanField(default=False)
 
+    # Denormalized page counters, maintained by DocumentPage signals and by
+    # sync_document_page_counts after bulk writes that bypass signals
+    page_count = models.PositiveIntegerField(default=0, editable=False)
+    pages_completed = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         return self.title
 
-    @property
-    def page_count(self):
-        return self.pages.count()
-
     def update_ocr_status(self):
-        """Update document OCR status based on all pages"""
-        if not self.pages.exists():
+        """Update document OCR status based on the stored page counters"""
+        # Single-row read of the denormalized counters instead of COUNTs
+        counts = (
+            Document.objects.filter(id=self.id)
+            .values_list("page_count", "pages_completed")
+            .first()
+        )
+        if counts is None:
             return
 
-        # Check if all pages are OCR completed
-        total_pages = self.pages.count()
-        completed_pages = self.pages.filter(ocr_completed=True).count()
-
-        if total_pages > 0 and completed_pages == total_pages:
+        total, completed = counts
+        if total > 0 and completed == total:
             self.ocr_completed = True
             self.save(update_fields=["ocr_completed"])
 
@@ -60,10 +68,9 @@ class Document(models.Model):
 
     def can_process_ocr(self):
         """Check if document has pages ready for OCR processing"""
+        # One EXISTS covers both "has pages" and "has unprocessed pages"
         return bool(
-            self.pages.exists()
-            and not self.ocr_completed
-            and self.pages.filter(ocr_completed=False).exists()
+            not self.ocr_completed and self.pages.filter(ocr_completed=False).exists()
         )
 
     def can_extract_genealogy(self):
@@ -73,31 +80,44 @@ class Document(models.Model):
     @property
     def ocr_progress(self):
         """Get OCR progress for multi-page documents"""
-        total_pages = self.pages.count()
-        if total_pages == 0:
+        # Fresh single-row read: the in-memory instance may predate the
+        # counter updates made by page signals
+        counts = (
+            Document.objects.filter(id=self.id)
+            .values_list("page_count", "pages_completed")
+            .first()
+        )
+        if counts is None or counts[0] == 0:
             return None
 
-        completed_pages = self.pages.filter(ocr_completed=True).count()
+        total, completed = counts
         return {
-            "completed": completed_pages,
-            "total": total_pages,
-            "percentage": (completed_pages / total_pages) * 100,
+            "completed": completed,
+            "total": total,
+            "percentage": (completed / total) * 100,
         }
 
     def get_combined_ocr_text(self):
         """Get combined OCR text from all pages"""
-        if not self.pages.exists():
-            return ""
-
-        return "\n\n".join(
-            [
-                f"=== Page {page.page_number} ===\n{page.ocr_text}"
-                for page in self.pages.filter(ocr_completed=True).order_by(
-                    "page_number"
+        # Concatenate server-side: one query returns the finished string
+        # instead of hydrating every page row into Python first
+        combined = (
+            self.pages.filter(ocr_completed=True)
+            .exclude(ocr_text="")
+            .aggregate(
+                combined=StringAgg(
+                    Concat(
+                        models.Value("=== Page "),
+                        Cast("page_number", output_field=models.CharField()),
+                        models.Value(" ===\n"),
+                        "ocr_text",
+                    ),
+                    delimiter="\n\n",
+                    order_by="page_number",
                 )
-                if page.ocr_text.strip()
-            ]
+            )["combined"]
         )
+        return combined or ""
 
 
 class DocumentPage(models.Model):
@@ -122,12 +142,26 @@ class DocumentPage(models.Model):
         default=0.0, help_text="Rotation correction applied in degrees"
     )
     original_filename = models.CharField(max_length=255, blank=True)
+    pdf_page_count = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Pages in the stored source PDF, parsed once at upload",
+    )
 
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ["document", "page_number"]
+        constraints = [
+            # Deferred so bulk renumbering can swap page numbers in a single
+            # pass; PostgreSQL only checks the constraint at commit time
+            models.UniqueConstraint(
+                fields=["document", "page_number"],
+                name="unique_document_page_number",
+                deferrable=models.Deferrable.DEFERRED,
+            )
+        ]
         ordering = ["document", "page_number"]
 
     def __str__(self):
@@ -150,6 +184,42 @@ class DocumentPage(models.Model):
         return bool(self.image_file and not self.ocr_completed)
 
 
+def sync_document_page_counts(document_ids):
+    """
+    Recompute the denormalized page counters for the given documents.
+
+    Individual page saves and deletes are handled by signals; callers that
+    use bulk_create, bulk_update or queryset.update must invoke this
+    explicitly afterwards since those bypass signals.
+    """
+    pages = DocumentPage.objects.filter(document=models.OuterRef("id"))
+    Document.objects.filter(id__in=document_ids).update(
+        page_count=Coalesce(
+            models.Subquery(
+                pages.values("document")
+                .annotate(total=models.Count("id"))
+                .values("total")
+            ),
+            0,
+        ),
+        pages_completed=Coalesce(
+            models.Subquery(
+                pages.filter(ocr_completed=True)
+                .values("document")
+                .annotate(total=models.Count("id"))
+                .values("total")
+            ),
+            0,
+        ),
+    )
+
+
+@receiver(post_save, sender=DocumentPage, dispatch_uid="documentpage_count_save")
+@receiver(post_delete, sender=DocumentPage, dispatch_uid="documentpage_count_delete")
+def _document_page_changed(sender, instance, **kwargs):  # noqa: ARG001
+    sync_document_page_counts([instance.document_id])
+
+
 class Place(models.Model):
     """Geographic location"""
 
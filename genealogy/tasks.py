@@ -1,30 +1,105 @@
+import hashlib
 import logging
-import os
+import uuid
+from pathlib import Path
 
-from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.utils import timezone
 
-from celery import shared_task
+from celery import chord, shared_task
 
-from .models import Document, DocumentPage
-from .ocr_processor import OCRProcessor
+from .models import Document, DocumentPage, sync_document_page_counts
+from .ocr_processor import get_processor
 
 logger = logging.getLogger(__name__)
 
+# Pages OCR'd per batch task; amortizes task overhead without letting one
+# slow batch hold up a document's chord for too long
+_OCR_BATCH_SIZE = 8
 
-@shared_task(bind=True)
-def process_page_ocr(self, page_id: str):  # noqa: ARG001
+# Baked into every OCR result cache key. The entries never expire, so bump
+# this whenever the pipeline's output changes (result tuple shape, rotation
+# handling, preprocessing) to make results from older code miss.
+_OCR_PIPELINE_VERSION = 2
+
+
+def _ocr_result_cache_key(file_path: str, language: str) -> str:
+    """Cache key for OCR results, addressed by file content and language"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return f"ocr-result:v{_OCR_PIPELINE_VERSION}:{digest.hexdigest()}:{language}"
+
+
+def invalidate_ocr_result_cache(pages) -> None:
     """
-    Process OCR for a single DocumentPage
+    Drop cached OCR results for the given DocumentPages.
 
-    Args:
-        page_id: UUID string of the DocumentPage to process
+    Forced reprocessing would otherwise be answered straight from the
+    content-addressed cache with the stale result it is meant to replace.
+    Pages whose image file is missing are skipped; there is nothing
+    cached under a key that can no longer be computed.
+    """
+    keys = []
+    for page in pages:
+        try:
+            keys.append(
+                _ocr_result_cache_key(page.image_file.path, page.document.languages)
+            )
+        except (OSError, ValueError):
+            continue
+    if keys:
+        cache.delete_many(keys)
 
-    Returns:
-        dict: Processing result with text, confidence, and status
+
+def _process_single_page(page_id: str) -> dict:
     """
+    OCR one DocumentPage and persist the result.
+
+    Shared body of process_page_ocr and process_pages_batch; returns the
+    per-page result dict either task reports.
+    """
+    # Reject malformed ids in pure Python before taking the lock or
+    # touching the database
     try:
-        # Get the page
-        page = DocumentPage.objects.get(id=page_id)
+        uuid.UUID(str(page_id))
+    except ValueError:
+        error_msg = f"Invalid UUID format: {page_id}"
+        logger.exception(error_msg)
+        return {
+            "success": False,
+            "error": error_msg,
+        }
+
+    # cache.add is atomic (SET NX): only one worker runs Tesseract for a
+    # given page at a time; duplicate submissions (retries, double clicks,
+    # re-uploads) return immediately instead of racing
+    lock_key = f"ocr-lock:{page_id}"
+    if not cache.add(lock_key, True, timeout=600):
+        logger.info(f"OCR already in progress for page {page_id}, skipping")
+        return {
+            "success": True,
+            "message": "Already being processed",
+            "page_id": str(page_id),
+        }
+
+    try:
+        # Get the page without its (possibly large) ocr_text column; the
+        # rare already-processed path below loads it on demand
+        page = (
+            DocumentPage.objects.select_related("document")
+            .only(
+                "id",
+                "document_id",
+                "page_number",
+                "image_file",
+                "ocr_completed",
+                "document__title",
+                "document__languages",
+            )
+            .get(id=page_id)
+        )
         logger.info(f"Starting OCR processing for page {page}")
 
         # Check if already processed
@@ -40,26 +115,44 @@ def process_page_ocr(self, page_id: str):  # noqa: ARG001
         # Get language from document
         language = page.document.languages
 
-        # Initialize OCR processor
-        processor = OCRProcessor(language=language)
-
-        # Process the image file
         file_path = page.image_file.path
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Image file not found: {file_path}")
-
-        # Perform OCR
-        text, confidence, rotation_applied = processor.process_file(file_path)
-
-        # Update the page with results
-        page.ocr_text = text
-        page.ocr_confidence = confidence
-        page.rotation_applied = rotation_applied
-        page.ocr_completed = True
-        page.save()
+        # A single stat covers the existence check; os.path.exists would
+        # stat the file and throw the result away
+        try:
+            Path(file_path).stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Image file not found: {file_path}") from None
+
+        # Identical page content (rescans, duplicate uploads) short-circuits
+        # to the cached result instead of re-running Tesseract
+        cache_key = _ocr_result_cache_key(file_path, language)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            text, confidence, rotation_applied = cached
+            logger.info(f"OCR result cache hit for page {page}")
+        else:
+            # Reuse the per-language processor for this worker process
+            # instead of constructing one per page
+            processor = get_processor(language)
+            text, confidence, rotation_applied = processor.process_file(file_path)
+            cache.set(cache_key, (text, confidence, rotation_applied), timeout=None)
+
+        # Write the results with one UPDATE: no full-row rewrite and no
+        # second trip for deferred columns. queryset.update bypasses both
+        # auto_now and the counter signals, so handle those here.
+        DocumentPage.objects.filter(pk=page.id).update(
+            ocr_text=text,
+            ocr_confidence=confidence,
+            rotation_applied=rotation_applied,
+            ocr_completed=True,
+            updated_at=timezone.now(),
+        )
+        sync_document_page_counts([page.document_id])
 
-        # Update parent document OCR status
-        page.document.update_ocr_status()
+        # Document-level status is owned by finalize_document_ocr: every
+        # dispatch path runs the page tasks as a chord header, so the
+        # callback fires exactly once after the last page finishes instead
+        # of N workers racing to update the same Document row here.
 
         logger.info(f"OCR completed for page {page}. Confidence: {confidence:.1f}%")
 
@@ -72,14 +165,6 @@ def process_page_ocr(self, page_id: str):  # noqa: ARG001
             "page_id": str(page_id),
         }
 
-    except ValidationError:
-        error_msg = f"Invalid UUID format: {page_id}"
-        logger.exception(error_msg)
-        return {
-            "success": False,
-            "error": error_msg,
-        }
-
     except DocumentPage.DoesNotExist:
         error_msg = f"DocumentPage with id {page_id} not found"
         logger.exception(error_msg)
@@ -105,6 +190,86 @@ def process_page_ocr(self, page_id: str):  # noqa: ARG001
             "page_id": str(page_id),
         }
 
+    finally:
+        cache.delete(lock_key)
+
+
+# acks_late: a page task lost to a worker crash is requeued instead of
+# dropped; the tasks are idempotent (completed pages short-circuit)
+@shared_task(bind=True, rate_limit="5/s", acks_late=True)
+def process_page_ocr(self, page_id: str):  # noqa: ARG001
+    """
+    Process OCR for a single DocumentPage
+
+    Args:
+        page_id: UUID string of the DocumentPage to process
+
+    Returns:
+        dict: Processing result with text, confidence, and status
+    """
+    return _process_single_page(page_id)
+
+
+@shared_task(bind=True, acks_late=True)
+def process_pages_batch(self, page_ids: list[str]):  # noqa: ARG001
+    """
+    Process OCR for a batch of DocumentPages in one worker invocation
+
+    Amortizes per-task overhead (broker round-trip, result write) across
+    the batch while the cached per-language processor keeps Tesseract's
+    language models loaded between pages.
+
+    Args:
+        page_ids: UUID strings of the DocumentPages to process
+
+    Returns:
+        list[dict]: Per-page processing results
+    """
+    return [_process_single_page(page_id) for page_id in page_ids]
+
+
+@shared_task(bind=True)
+def finalize_document_ocr(self, results, document_id: str):  # noqa: ARG001
+    """
+    Chord callback: update document status once all page tasks finished
+
+    Args:
+        results: Per-page results collected from the chord header
+        document_id: UUID string of the Document whose pages were processed
+
+    Returns:
+        dict: Finalization summary
+    """
+    try:
+        uuid.UUID(str(document_id))
+    except ValueError:
+        error_msg = f"Invalid UUID format: {document_id}"
+        logger.exception(error_msg)
+        return {
+            "success": False,
+            "error": error_msg,
+        }
+
+    try:
+        # Only the fields update_ocr_status touches are needed
+        document = Document.objects.only("id", "ocr_completed").get(id=document_id)
+        document.update_ocr_status()
+        # Header entries are single-page dicts or per-batch lists of them
+        pages_processed = sum(len(r) if isinstance(r, list) else 1 for r in results)
+        return {
+            "success": True,
+            "document_id": str(document_id),
+            "pages_processed": pages_processed,
+        }
+
+    except Document.DoesNotExist:
+        error_msg = f"Document with id {document_id} not found"
+        logger.exception(error_msg)
+        return {
+            "success": False,
+            "error": error_msg,
+        }
+
 
 @shared_task(bind=True)
 def process_document_ocr(self, document_id: str):  # noqa: ARG001
@@ -117,15 +282,31 @@ def process_document_ocr(self, document_id: str):  # noqa: ARG001
     Returns:
         dict: Processing result summary
     """
+    # Reject malformed ids in pure Python before any database round-trip
     try:
-        # Get the document
-        document = Document.objects.get(id=document_id)
+        uuid.UUID(str(document_id))
+    except ValueError:
+        error_msg = f"Invalid UUID format: {document_id}"
+        logger.exception(error_msg)
+        return {
+            "success": False,
+            "error": error_msg,
+        }
+
+    try:
+        # Get the document; only the fields used below are loaded
+        document = Document.objects.only("id", "title").get(id=document_id)
         logger.info(f"Starting OCR processing for document {document}")
 
-        # Get all unprocessed pages
-        unprocessed_pages = document.pages.filter(ocr_completed=False)
+        # Get all unprocessed pages; only the ids are needed for dispatch
+        page_ids = [
+            str(page_id)
+            for page_id in document.pages.filter(ocr_completed=False).values_list(
+                "id", flat=True
+            )
+        ]
 
-        if not unprocessed_pages.exists():
+        if not page_ids:
             logger.info(f"No unprocessed pages found for document {document_id}")
             return {
                 "success": True,
@@ -133,32 +314,29 @@ def process_document_ocr(self, document_id: str):  # noqa: ARG001
                 "pages_processed": 0,
             }
 
-        # Start OCR tasks for each page
-        task_ids = []
-        for page in unprocessed_pages:
-            task = process_page_ocr.delay(str(page.id))
-            task_ids.append(task.id)
+        # One chord of batched page tasks: the header goes to the broker in
+        # a single pipelined submission, each batch amortizes task overhead
+        # over up to eight pages, and the body updates the document status
+        # exactly once, after the last batch finishes
+        callback = chord(
+            process_pages_batch.s(page_ids[start : start + _OCR_BATCH_SIZE])
+            for start in range(0, len(page_ids), _OCR_BATCH_SIZE)
+        )(finalize_document_ocr.s(str(document_id)))
+        task_ids = [r.id for r in callback.parent.results] if callback.parent else []
 
         logger.info(
-            f"Started OCR processing for {len(task_ids)} pages in document {document}"
+            f"Started OCR processing for {len(page_ids)} pages "
+            f"in document {document}"
         )
 
         return {
             "success": True,
-            "message": f"OCR processing started for {len(task_ids)} pages",
-            "pages_processed": len(task_ids),
+            "message": f"OCR processing started for {len(page_ids)} pages",
+            "pages_processed": len(page_ids),
             "task_ids": task_ids,
             "document_id": str(document_id),
         }
 
-    except ValidationError:
-        error_msg = f"Invalid UUID format: {document_id}"
-        logger.exception(error_msg)
-        return {
-            "success": False,
-            "error": error_msg,
-        }
-
     except Document.DoesNotExist:
         error_msg = f"Document with id {document_id} not found"
         logger.exception(error_msg)
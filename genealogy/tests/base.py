@@ -0,0 +1,23 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+
+class TempMediaRootTestCase(TestCase):
+    """
+    TestCase whose MEDIA_ROOT points at a per-class temporary directory.
+
+    The directory is created in setUpClass and removed when the class
+    finishes, instead of every decorated class leaking a mkdtemp created
+    at import time whether or not its tests run.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root, ignore_errors=True)
+        cls._media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls._media_override.enable()
+        cls.addClassCleanup(cls._media_override.disable)
+        super().setUpClass()
@@ -1,16 +1,15 @@
-import tempfile
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase, override_settings
+from django.test import Client
 from django.urls import reverse
 
 from genealogy.models import Document, DocumentPage
+from genealogy.tests.base import TempMediaRootTestCase
 
 
-@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
-class AdminBatchUploadTests(TestCase):
+class AdminBatchUploadTests(TempMediaRootTestCase):
     """Test batch upload functionality in admin"""
 
     def setUp(self):
@@ -191,12 +190,9 @@ class AdminBatchUploadTests(TestCase):
                 Document.objects.all().delete()
                 DocumentPage.objects.all().delete()
 
-    @patch("genealogy.admin.process_page_ocr.delay")
-    def test_batch_upload_auto_starts_ocr(self, mock_task_delay):
+    @patch("genealogy.admin.chord")
+    def test_batch_upload_auto_starts_ocr(self, mock_chord):
         """Should automatically start OCR processing for uploaded files"""
-        # Mock the Celery task
-        mock_task_delay.return_value.id = "test-task-id"
-
         # Create test files
         file1 = SimpleUploadedFile(
             "page1.pdf", b"content1", content_type="application/pdf"
@@ -220,20 +216,19 @@ class AdminBatchUploadTests(TestCase):
         self.assertEqual(Document.objects.count(), 1)
         self.assertEqual(DocumentPage.objects.count(), 2)
 
-        # Should have called OCR task for both pages
-        self.assertEqual(mock_task_delay.call_count, 2)
+        # Should have dispatched a single chord covering both pages
+        mock_chord.assert_called_once()
+        mock_chord.return_value.assert_called_once()
 
-        # Verify task was called with correct page IDs
+        # Verify the chord header contains a task signature per page
+        signatures = list(mock_chord.call_args[0][0])
         page_ids = {str(page.id) for page in DocumentPage.objects.all()}
-        called_page_ids = {call[0][0] for call in mock_task_delay.call_args_list}
+        called_page_ids = {sig.args[0] for sig in signatures}
         self.assertEqual(page_ids, called_page_ids)
 
-    @patch("genealogy.admin.process_page_ocr.delay")
-    def test_document_page_ocr_action(self, mock_task_delay):
+    @patch("genealogy.admin.chord")
+    def test_document_page_ocr_action(self, mock_chord):
         """Should process OCR for selected document pages"""
-        # Mock the Celery task
-        mock_task_delay.return_value.id = "test-task-id"
-
         # Create test document and pages
         document = Document.objects.create(title="Test Doc", languages="eng")
         page1 = DocumentPage.objects.create(
@@ -266,14 +261,13 @@ class AdminBatchUploadTests(TestCase):
         admin.process_ocr(request, queryset)
 
         # Should only process unprocessed page
-        mock_task_delay.assert_called_once_with(str(page1.id))
+        mock_chord.assert_called_once()
+        signatures = list(mock_chord.call_args[0][0])
+        self.assertEqual([sig.args[0] for sig in signatures], [str(page1.id)])
 
-    @patch("genealogy.admin.process_page_ocr.delay")
-    def test_document_page_reprocess_ocr_action(self, mock_task_delay):
+    @patch("genealogy.admin.chord")
+    def test_document_page_reprocess_ocr_action(self, mock_chord):
         """Should reprocess OCR for selected document pages including completed ones"""
-        # Mock the Celery task
-        mock_task_delay.return_value.id = "test-task-id"
-
         # Create test document and page that's already processed
         document = Document.objects.create(title="Test Doc", languages="eng")
         page = DocumentPage.objects.create(
@@ -297,8 +291,19 @@ class AdminBatchUploadTests(TestCase):
         request = self.client.request().wsgi_request
         queryset = DocumentPage.objects.filter(id=page.id)
 
+        # Seed the content-addressed cache as a completed run would have
+        from django.core.cache import cache
+
+        from genealogy.tasks import _ocr_result_cache_key
+
+        cache_key = _ocr_result_cache_key(page.image_file.path, "eng")
+        cache.set(cache_key, ("Existing text", 95.0, 0.0), timeout=None)
+
         admin.reprocess_ocr(request, queryset)
 
+        # The cached result must not survive a forced rerun
+        self.assertIsNone(cache.get(cache_key))
+
         # Should reset page and start reprocessing
         page.refresh_from_db()
         self.assertFalse(page.ocr_completed)
@@ -306,4 +311,6 @@ class AdminBatchUploadTests(TestCase):
         self.assertIsNone(page.ocr_confidence)
         self.assertEqual(page.rotation_applied, 0.0)
 
-        mock_task_delay.assert_called_once_with(str(page.id))
+        mock_chord.assert_called_once()
+        signatures = list(mock_chord.call_args[0][0])
+        self.assertEqual([sig.args[0] for sig in signatures], [str(page.id)])
@@ -1,13 +1,10 @@
-import tempfile
-
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, override_settings
 
 from genealogy.models import Document, DocumentPage
+from genealogy.tests.base import TempMediaRootTestCase
 
 
-@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
-class DocumentModelTests(TestCase):
+class DocumentModelTests(TempMediaRootTestCase):
     """Test Document model business logic"""
 
     def setUp(self):
@@ -102,8 +99,7 @@ class DocumentModelTests(TestCase):
         self.assertAlmostEqual(progress["percentage"], 66.67, places=1)
 
 
-@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
-class DocumentPageModelTests(TestCase):
+class DocumentPageModelTests(TempMediaRootTestCase):
     """Test DocumentPage model business logic"""
 
     def setUp(self):
@@ -4,6 +4,8 @@ from unittest.mock import Mock, patch
 
 from django.test import TestCase
 
+from PIL import Image
+
 from genealogy.ocr_processor import OCRProcessor
 
 
@@ -14,9 +16,6 @@ class OCRProcessorTests(TestCase):
         """Create OCR processor"""
         self.processor = OCRProcessor(language="eng+nld")
 
-    @patch("genealogy.ocr_processor.ImageEnhance.Sharpness")
-    @patch("genealogy.ocr_processor.ImageEnhance.Contrast")
-    @patch("genealogy.ocr_processor.pytesseract.image_to_string")
     @patch("genealogy.ocr_processor.pytesseract.image_to_osd")
     @patch("genealogy.ocr_processor.pytesseract.image_to_data")
     @patch("genealogy.ocr_processor.Image.open")
@@ -25,31 +24,20 @@ class OCRProcessorTests(TestCase):
         mock_image_open,
         mock_image_to_data,
         mock_image_to_osd,
-        mock_image_to_string,
-        mock_contrast,
-        mock_sharpness,
     ):
         """Processing image file should return text, confidence, and rotation"""
-        # Mock image
-        mock_image = Mock()
-        mock_image.mode = "RGB"
-        mock_image.convert.return_value = mock_image
-        mock_image.rotate.return_value = mock_image
-        mock_image_open.return_value = mock_image
-
-        # Mock image enhancers
-        mock_contrast_enhancer = Mock()
-        mock_contrast_enhancer.enhance.return_value = mock_image
-        mock_contrast.return_value = mock_contrast_enhancer
-
-        mock_sharpness_enhancer = Mock()
-        mock_sharpness_enhancer.enhance.return_value = mock_image
-        mock_sharpness.return_value = mock_sharpness_enhancer
+        # Real image so grayscale conversion and enhancement run for real
+        mock_image_open.return_value = Image.new("RGB", (100, 80), color="white")
 
         # Mock OCR results
         mock_image_to_osd.return_value = "Rotate: 0\nOrientation confidence: 1.23"
-        mock_image_to_string.return_value = "Sample OCR text from image"
-        mock_image_to_data.return_value = {"conf": ["95", "87", "92", "88"]}
+        mock_image_to_data.return_value = {
+            "text": ["Sample", "OCR", "text", "from", "image"],
+            "conf": ["95", "87", "92", "88", "-1"],
+            "block_num": [1, 1, 1, 1, 1],
+            "par_num": [1, 1, 1, 1, 1],
+            "line_num": [1, 1, 1, 1, 1],
+        }
 
         # Create temp image file
         with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp_file:
@@ -62,48 +50,33 @@ class OCRProcessorTests(TestCase):
             self.assertEqual(confidence, 90.5)  # Average of [95, 87, 92, 88]
             self.assertEqual(rotation, 0)
 
-            # Verify image was converted to grayscale
-            mock_image.convert.assert_called_with("L")
-
         finally:
             Path(tmp_path).unlink()
 
-    @patch("genealogy.ocr_processor.ImageEnhance.Sharpness")
-    @patch("genealogy.ocr_processor.ImageEnhance.Contrast")
-    @patch("genealogy.ocr_processor.convert_from_bytes")
-    @patch("genealogy.ocr_processor.pytesseract.image_to_string")
+    @patch("genealogy.ocr_processor.convert_from_path")
     @patch("genealogy.ocr_processor.pytesseract.image_to_osd")
     @patch("genealogy.ocr_processor.pytesseract.image_to_data")
     def test_process_pdf_file_success(
         self,
         mock_image_to_data,
         mock_image_to_osd,
-        mock_image_to_string,
-        mock_convert_from_bytes,
-        mock_contrast,
-        mock_sharpness,
+        mock_convert_from_path,
     ):
         """Processing PDF file should convert to image and return OCR results"""
-        # Mock PDF conversion
-        mock_image = Mock()
-        mock_image.mode = "RGB"
-        mock_image.convert.return_value = mock_image
-        mock_image.rotate.return_value = mock_image
-        mock_convert_from_bytes.return_value = [mock_image]
-
-        # Mock image enhancers
-        mock_contrast_enhancer = Mock()
-        mock_contrast_enhancer.enhance.return_value = mock_image
-        mock_contrast.return_value = mock_contrast_enhancer
-
-        mock_sharpness_enhancer = Mock()
-        mock_sharpness_enhancer.enhance.return_value = mock_image
-        mock_sharpness.return_value = mock_sharpness_enhancer
+        # Real image so rotation correction and enhancement run for real
+        mock_convert_from_path.return_value = [
+            Image.new("RGB", (100, 80), color="white")
+        ]
 
         # Mock OCR results
         mock_image_to_osd.return_value = "Rotate: 90\nOrientation confidence: 1.23"
-        mock_image_to_string.return_value = "PDF OCR text content"
-        mock_image_to_data.return_value = {"conf": ["80", "75", "85"]}
+        mock_image_to_data.return_value = {
+            "text": ["PDF", "OCR", "text", "content"],
+            "conf": ["80", "75", "85", "-1"],
+            "block_num": [1, 1, 1, 1],
+            "par_num": [1, 1, 1, 1],
+            "line_num": [1, 1, 1, 1],
+        }
 
         # Create temp PDF file
         with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_file:
@@ -118,7 +91,7 @@ class OCRProcessorTests(TestCase):
             self.assertEqual(rotation, 90)
 
             # Verify PDF was converted
-            mock_convert_from_bytes.assert_called_once()
+            mock_convert_from_path.assert_called_once()
 
         finally:
             Path(tmp_path).unlink()
@@ -129,25 +102,32 @@ class OCRProcessorTests(TestCase):
         mock_image_to_osd.side_effect = Exception("OSD failed")
 
         mock_image = Mock()
-        rotation = self.processor._detect_and_correct_rotation(mock_image)
+        rotation, confidence = self.processor._detect_and_correct_rotation(mock_image)
 
         self.assertEqual(rotation, 0)
+        self.assertEqual(confidence, 0.0)
 
-    @patch("genealogy.ocr_processor.pytesseract.image_to_data")
-    def test_confidence_calculation_filters_invalid_scores(self, mock_image_to_data):
+    def test_confidence_calculation_filters_invalid_scores(self):
         """Confidence calculation should average only valid scores"""
-        mock_image_to_data.return_value = {"conf": ["95", "0", "87", "-1", "92"]}
+        data = {
+            "text": ["word1", "", "word2", "", "word3"],
+            "conf": ["95", "0", "87", "-1", "92"],
+            "block_num": [1, 1, 1, 1, 1],
+            "par_num": [1, 1, 1, 1, 1],
+            "line_num": [1, 1, 2, 2, 2],
+        }
 
-        mock_image = Mock()
-        confidence = self.processor._get_confidence_score(mock_image)
+        text, confidence = self.processor._text_and_confidence_from_data(data)
 
         # Should average only positive scores: (95 + 87 + 92) / 3 = 91.33
         self.assertAlmostEqual(confidence, 91.33, places=1)
+        # Words are grouped into lines; empty entries are dropped
+        self.assertEqual(text, "word1\nword2 word3")
 
-    @patch("genealogy.ocr_processor.convert_from_bytes")
-    def test_pdf_conversion_no_pages_raises_error(self, mock_convert_from_bytes):
+    @patch("genealogy.ocr_processor.convert_from_path")
+    def test_pdf_conversion_no_pages_raises_error(self, mock_convert_from_path):
         """PDF with no pages should raise ValueError"""
-        mock_convert_from_bytes.return_value = []
+        mock_convert_from_path.return_value = []
 
         with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_file:
             tmp_file.write(b"fake pdf content")
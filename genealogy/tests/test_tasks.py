@@ -1,20 +1,49 @@
-import tempfile
 import uuid
 from unittest.mock import Mock, patch
 
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, override_settings
+from django.test import override_settings
 
 from genealogy.models import Document, DocumentPage
-from genealogy.tasks import process_document_ocr, process_page_ocr
+from genealogy.tasks import (
+    finalize_document_ocr,
+    process_document_ocr,
+    process_page_ocr,
+)
+from genealogy.tests.base import TempMediaRootTestCase
 
 
-@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
-class OCRTaskTests(TestCase):
+class FakeOCRProcessor:
+    """In-memory OCRProcessor stand-in: cheaper and stricter than a Mock"""
+
+    def __init__(self, result=("Extracted text content", 85.5, 0.0), error=None):
+        self.result = result
+        self.error = error
+
+    def process_file(self, file_path):  # noqa: ARG002
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@override_settings(
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+)
+class OCRTaskTests(TempMediaRootTestCase):
     """Test OCR Celery tasks - mock external dependencies"""
 
+    @staticmethod
+    def run_task(task, *args):
+        """Run a task through Celery's eager machinery, not as a function"""
+        return task.apply(args=args).get()
+
     def setUp(self):
         """Create test document and page"""
+        # OCR results are cached by file content, which is identical
+        # across tests; start each test with an empty cache
+        cache.clear()
         self.document = Document.objects.create(
             title="Test Document",
             languages="eng+nld",
@@ -30,20 +59,18 @@ class OCRTaskTests(TestCase):
             image_file=self.test_file,
         )
 
-    @patch("genealogy.tasks.OCRProcessor")
-    @patch("genealogy.tasks.os.path.exists")
-    def test_process_page_ocr_success(self, mock_exists, mock_ocr_processor_class):
+    @patch("genealogy.tasks.get_processor")
+    @patch("genealogy.tasks.Path")
+    def test_process_page_ocr_success(self, mock_stat, mock_get_processor):
         """process_page_ocr should complete successfully and update page"""
         # Mock file exists
-        mock_exists.return_value = True
+        mock_stat.return_value.stat.return_value = Mock()
 
-        # Mock OCR processor
-        mock_processor = Mock()
-        mock_processor.process_file.return_value = ("Extracted text content", 85.5, 0.0)
-        mock_ocr_processor_class.return_value = mock_processor
+        # Fake OCR processor
+        mock_get_processor.return_value = FakeOCRProcessor()
 
         # Run task
-        result = process_page_ocr(str(self.page.id))
+        result = self.run_task(process_page_ocr, str(self.page.id))
 
         # Check result
         self.assertTrue(result["success"])
@@ -58,13 +85,55 @@ class OCRTaskTests(TestCase):
         self.assertEqual(self.page.ocr_confidence, 85.5)
         self.assertEqual(self.page.rotation_applied, 0.0)
 
-        # Check document status was updated
+        # Document status is owned by the chord callback, not the page task
+        self.document.refresh_from_db()
+        self.assertFalse(self.document.ocr_completed)
+
+        self.run_task(finalize_document_ocr, [result], str(self.document.id))
         self.document.refresh_from_db()
         self.assertTrue(self.document.ocr_completed)
 
+    @patch("genealogy.tasks.get_processor")
+    @patch("genealogy.tasks.Path")
+    def test_process_page_ocr_cache_hit(self, mock_stat, mock_get_processor):
+        """process_page_ocr should reuse cached results for identical content"""
+        mock_stat.return_value.stat.return_value = Mock()
+
+        from genealogy.tasks import _ocr_result_cache_key
+
+        key = _ocr_result_cache_key(self.page.image_file.path, "eng+nld")
+        cache.set(key, ("Cached text", 77.0, 0.0), timeout=None)
+
+        result = self.run_task(process_page_ocr, str(self.page.id))
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["text"], "Cached text")
+        self.assertEqual(result["confidence"], 77.0)
+
+        # No processor should have been built, let alone run
+        mock_get_processor.assert_not_called()
+
+        self.page.refresh_from_db()
+        self.assertTrue(self.page.ocr_completed)
+        self.assertEqual(self.page.ocr_text, "Cached text")
+
+    @patch("genealogy.tasks.get_processor")
+    def test_process_page_ocr_lock_held(self, mock_get_processor):
+        """process_page_ocr should skip pages another worker is processing"""
+        cache.set(f"ocr-lock:{self.page.id}", True, timeout=600)
+
+        result = self.run_task(process_page_ocr, str(self.page.id))
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["message"], "Already being processed")
+        mock_get_processor.assert_not_called()
+
+        self.page.refresh_from_db()
+        self.assertFalse(self.page.ocr_completed)
+
     def test_process_page_ocr_invalid_uuid(self):
         """process_page_ocr should handle invalid UUID format"""
-        result = process_page_ocr("invalid-uuid-format")
+        result = self.run_task(process_page_ocr, "invalid-uuid-format")
 
         self.assertFalse(result["success"])
         self.assertIn("Invalid UUID format", result["error"])
@@ -72,7 +141,7 @@ class OCRTaskTests(TestCase):
     def test_process_page_ocr_nonexistent_page(self):
         """process_page_ocr should handle valid UUID that doesn't exist"""
         fake_uuid = str(uuid.uuid4())
-        result = process_page_ocr(fake_uuid)
+        result = self.run_task(process_page_ocr, fake_uuid)
 
         self.assertFalse(result["success"])
         self.assertIn("not found", result["error"])
@@ -85,44 +154,42 @@ class OCRTaskTests(TestCase):
         self.page.ocr_confidence = 90.0
         self.page.save()
 
-        result = process_page_ocr(str(self.page.id))
+        result = self.run_task(process_page_ocr, str(self.page.id))
 
         self.assertTrue(result["success"])
         self.assertEqual(result["message"], "Already processed")
         self.assertEqual(result["text"], "Existing text")
         self.assertEqual(result["confidence"], 90.0)
 
-    @patch("genealogy.tasks.OCRProcessor")
-    @patch("genealogy.tasks.os.path.exists")
+    @patch("genealogy.tasks.get_processor")
+    @patch("genealogy.tasks.Path")
     def test_process_page_ocr_file_not_found(
         self,
-        mock_exists,
-        mock_ocr_processor_class,  # noqa: ARG002
+        mock_stat,
+        mock_get_processor,  # noqa: ARG002
     ):
         """process_page_ocr should handle missing image files"""
         # Mock file doesn't exist
-        mock_exists.return_value = False
+        mock_stat.return_value.stat.side_effect = FileNotFoundError
 
-        result = process_page_ocr(str(self.page.id))
+        result = self.run_task(process_page_ocr, str(self.page.id))
 
         self.assertFalse(result["success"])
         self.assertIn("Image file not found", result["error"])
 
-    @patch("genealogy.tasks.OCRProcessor")
-    @patch("genealogy.tasks.os.path.exists")
-    def test_process_page_ocr_processing_failure(
-        self, mock_exists, mock_ocr_processor_class
-    ):
+    @patch("genealogy.tasks.get_processor")
+    @patch("genealogy.tasks.Path")
+    def test_process_page_ocr_processing_failure(self, mock_stat, mock_get_processor):
         """process_page_ocr should handle OCR processing failures"""
         # Mock file exists
-        mock_exists.return_value = True
+        mock_stat.return_value.stat.return_value = Mock()
 
-        # Mock OCR processor failure
-        mock_processor = Mock()
-        mock_processor.process_file.side_effect = Exception("OCR processing failed")
-        mock_ocr_processor_class.return_value = mock_processor
+        # Fake OCR processor failure
+        mock_get_processor.return_value = FakeOCRProcessor(
+            error=Exception("OCR processing failed")
+        )
 
-        result = process_page_ocr(str(self.page.id))
+        result = self.run_task(process_page_ocr, str(self.page.id))
 
         self.assertFalse(result["success"])
         self.assertIn("OCR processing failed", result["error"])
@@ -131,8 +198,8 @@ class OCRTaskTests(TestCase):
         self.page.refresh_from_db()
         self.assertFalse(self.page.ocr_completed)
 
-    @patch("genealogy.tasks.process_page_ocr.delay")
-    def test_process_document_ocr_success(self, mock_page_task):
+    @patch("genealogy.tasks.chord")
+    def test_process_document_ocr_success(self, mock_chord):
         """process_document_ocr should start tasks for all unprocessed pages"""
         # Add another unprocessed page
         test_file2 = SimpleUploadedFile(
@@ -144,19 +211,26 @@ class OCRTaskTests(TestCase):
             image_file=test_file2,
         )
 
-        # Mock task delay
-        mock_task = Mock()
-        mock_task.id = "task-123"
-        mock_page_task.return_value = mock_task
+        # Mock the dispatched chord: the callback's parent holds the
+        # header's per-batch results
+        mock_callback = Mock()
+        mock_callback.parent.results = [Mock(id="task-1")]
+        mock_chord.return_value.return_value = mock_callback
 
-        result = process_document_ocr(str(self.document.id))
+        result = self.run_task(process_document_ocr, str(self.document.id))
 
         self.assertTrue(result["success"])
         self.assertEqual(result["pages_processed"], 2)
-        self.assertIn("task_ids", result)
-
-        # Should have called page task twice
-        self.assertEqual(mock_page_task.call_count, 2)
+        self.assertEqual(result["task_ids"], ["task-1"])
+
+        # Both pages fit one batch, so the chord header is one signature
+        mock_chord.assert_called_once()
+        signatures = list(mock_chord.call_args[0][0])
+        self.assertEqual(len(signatures), 1)
+        self.assertEqual(
+            set(signatures[0].args[0]),
+            {str(self.page.id), str(page2.id)},
+        )
 
     def test_process_document_ocr_no_pages(self):
         """process_document_ocr should handle documents with no unprocessed pages"""
@@ -164,7 +238,7 @@ class OCRTaskTests(TestCase):
         self.page.ocr_completed = True
         self.page.save()
 
-        result = process_document_ocr(str(self.document.id))
+        result = self.run_task(process_document_ocr, str(self.document.id))
 
         self.assertTrue(result["success"])
         self.assertEqual(result["message"], "No pages to process")
@@ -172,7 +246,7 @@ class OCRTaskTests(TestCase):
 
     def test_process_document_ocr_invalid_uuid(self):
         """process_document_ocr should handle invalid UUID format"""
-        result = process_document_ocr("invalid-uuid-format")
+        result = self.run_task(process_document_ocr, "invalid-uuid-format")
 
         self.assertFalse(result["success"])
         self.assertIn("Invalid UUID format", result["error"])
@@ -180,7 +254,7 @@ class OCRTaskTests(TestCase):
     def test_process_document_ocr_nonexistent_document(self):
         """process_document_ocr should handle valid UUID that doesn't exist"""
         fake_uuid = str(uuid.uuid4())
-        result = process_document_ocr(fake_uuid)
+        result = self.run_task(process_document_ocr, fake_uuid)
 
         self.assertFalse(result["success"])
         self.assertIn("not found", result["error"])
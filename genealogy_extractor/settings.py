@@ -134,18 +134,43 @@ MEDIA_ROOT = BASE_DIR / "media"
 # File upload settings - support very large batch uploads
 DATA_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024 * 1024  # 20 GB
 FILE_UPLOAD_MAX_MEMORY_SIZE = (
-    500 * 1024 * 1024
-)  # 500 MB per individual file (107.5MB files need more headroom)
+    5 * 1024 * 1024
+)  # Files above 5 MB stream to disk; the batch upload view forces
+# TemporaryFileUploadHandler regardless, so large scans never sit in RAM
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000  # Support up to 1000 files in batch upload
 
+# Cache configuration (same Redis instance as Celery, separate database)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{os.environ['REDIS_HOST']}:{os.environ['REDIS_PORT']}/1",
+    }
+}
+
 # Celery configuration
 CELERY_BROKER_URL = f"redis://{os.environ['REDIS_HOST']}:{os.environ['REDIS_PORT']}/0"
 CELERY_RESULT_BACKEND = (
     f"redis://{os.environ['REDIS_HOST']}:{os.environ['REDIS_PORT']}/0"
 )
-CELERY_ACCEPT_CONTENT = ["json"]
-CELERY_TASK_SERIALIZER = "json"
-CELERY_RESULT_SERIALIZER = "json"
+# orjson is registered with kombu in celery.py; plain json stays accepted
+# for messages published by older clients
+CELERY_ACCEPT_CONTENT = ["orjson", "json"]
+# Page OCR runs on its own queue so it can be consumed by a worker using a
+# thread pool (Tesseract releases the GIL during the C call), e.g.
+#   celery -A genealogy_extractor worker -Q ocr -P threads -c 8
+# while the default prefork worker keeps handling everything else.
+CELERY_TASK_ROUTES = {
+    "genealogy.tasks.process_page_ocr": {"queue": "ocr"},
+    "genealogy.tasks.process_pages_batch": {"queue": "ocr"},
+}
+# Keepalive stops idle broker connections from being torn down between
+# bursts; prefetch 1 keeps long OCR tasks from being hoarded by one worker
+# slot while others sit idle. Fan-out goes through group/chord so a whole
+# document is still published in one pipelined send.
+CELERY_BROKER_TRANSPORT_OPTIONS = {"socket_keepalive": True}
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_SERIALIZER = "orjson"
+CELERY_RESULT_SERIALIZER = "orjson"
 CELERY_TIMEZONE = TIME_ZONE
 
 # Default primary key field type
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Manual end-to-end smoke test for the OCR pipeline.
+
+Creates a document with synthetic scanned pages, dispatches the OCR
+tasks as one group, and prints the results. Not part of the unit-test
+suite — run it against a configured environment (database, Redis,
+worker):
+
+    python test-ocr-workflow.py
+"""
+
+import functools
+import os
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+import django
+
+from celery import group
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "genealogy_extractor.settings")
+django.setup()
+
+from django.core.files.base import ContentFile  # noqa: E402
+
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+from genealogy.models import Document, DocumentPage  # noqa: E402
+from genealogy.tasks import process_page_ocr  # noqa: E402
+
+# The fixture is identical between runs, so it is generated once and
+# reused from disk instead of being redrawn per invocation
+_FIXTURE_PATH = Path(tempfile.gettempdir()) / "ocr-workflow-fixture.png"
+
+# Pages created per run; all tasks are published in one group so the
+# smoke test exercises the same parallel fan-out as production
+_PAGE_COUNT = 3
+
+# Loaded once; font-metric setup is not worth repeating per fixture
+_FIXTURE_FONT = ImageFont.load_default()
+
+_TEST_PAGE_LINES = [
+    "Birth Record",
+    "Jan van der Berg",
+    "Born: 12 March 1885",
+    "Amsterdam, Netherlands",
+    "Father: Pieter van der Berg",
+    "Mother: Maria Jansen",
+]
+
+
+@functools.lru_cache(maxsize=1)
+def create_test_image() -> bytes:
+    """Return the fixture page PNG, generating it only when missing."""
+    if _FIXTURE_PATH.exists():
+        return _FIXTURE_PATH.read_bytes()
+
+    # Grayscale: a third of the RGB buffer, and Tesseract converts to
+    # gray internally anyway. Low compression keeps the encode cheap.
+    image = Image.new("L", (500, 300), color=255)
+    draw = ImageDraw.Draw(image)
+    # One multiline_text call lays out every line in a single pass
+    draw.multiline_text(
+        (20, 20),
+        "\n".join(_TEST_PAGE_LINES),
+        fill=0,
+        font=_FIXTURE_FONT,
+        spacing=24,
+    )
+
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    data = buffer.getvalue()
+    _FIXTURE_PATH.write_bytes(data)
+    return data
+
+
+def main():
+    document = Document.objects.create(
+        title="OCR Workflow Test",
+        languages="eng",
+    )
+    image_bytes = create_test_image()
+    pages = DocumentPage.objects.bulk_create(
+        DocumentPage(
+            document=document,
+            page_number=page_num,
+            image_file=ContentFile(
+                image_bytes, name=f"ocr_workflow_page_{page_num:03d}.png"
+            ),
+            original_filename=f"ocr_workflow_page_{page_num:03d}.png",
+        )
+        for page_num in range(1, _PAGE_COUNT + 1)
+    )
+    print(f"Created document '{document.title}' with {len(pages)} pages")
+
+    job = group(process_page_ocr.s(str(page.id)) for page in pages).apply_async()
+    print(f"Dispatched {len(pages)} OCR tasks in one group, waiting...")
+    outcomes = job.get(timeout=600)
+
+    for page, outcome in zip(pages, outcomes, strict=True):
+        page.refresh_from_db()
+        print(
+            f"Page {page.page_number}: success={outcome['success']} "
+            f"confidence={page.ocr_confidence} rotation={page.rotation_applied}"
+        )
+
+    pages[0].refresh_from_db()
+    print("Extracted text (page 1):")
+    print(pages[0].ocr_text)
+
+
+if __name__ == "__main__":
+    main()